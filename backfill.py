@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+from queue import Empty
+
+import discord
+
+# Add the src directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.utils.indexer import MessageIndexer
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# How often the writer checks whether crawlers are still alive while the queue is empty
+WRITER_POLL_SECONDS = 5
+
+
+async def list_text_channels(guild_id: int):
+    """Fetch (id, name) of every text channel in a guild over REST"""
+    client = discord.Client(intents=discord.Intents.none())
+    try:
+        await client.login(settings.DISCORD_TOKEN)
+        guild = await client.fetch_guild(guild_id)
+        channels = await guild.fetch_channels()
+        return [(str(c.id), c.name) for c in channels if isinstance(c, discord.TextChannel)]
+    finally:
+        await client.close()
+
+
+async def crawl_channels(channel_ids, queue):
+    """Index a subset of channels, sending batches and progress to the writer"""
+    # put() blocks when the writer falls behind, throttling this crawler
+    indexer = MessageIndexer(batch_writer=lambda batch: queue.put(('batch', batch)))
+    client = discord.Client(intents=discord.Intents.none())
+    try:
+        # REST-only login, the crawler never opens a gateway connection
+        await client.login(settings.DISCORD_TOKEN)
+        for channel_id in channel_ids:
+            queue.put(('progress', channel_id, 'running', None))
+
+            async def progress_callback(count, channel_id=channel_id):
+                queue.put(('progress', channel_id, None, count))
+
+            try:
+                channel = await client.fetch_channel(int(channel_id))
+                total = await indexer.index_channel(channel, progress_callback)
+                queue.put(('progress', channel_id, 'done', total))
+                logger.info(f"完成索引頻道 {channel.name}: {total} 則訊息")
+            except discord.Forbidden:
+                logger.warning(f"無權限存取頻道 {channel_id}")
+                queue.put(('progress', channel_id, 'failed', None))
+            except Exception as e:
+                logger.error(f"處理頻道 {channel_id} 時發生錯誤: {e}", exc_info=True)
+                queue.put(('progress', channel_id, 'failed', None))
+    finally:
+        await client.close()
+
+
+def crawler_process(channel_ids, queue):
+    """Process entry point, each crawler runs its own event loop"""
+    try:
+        asyncio.run(crawl_channels(channel_ids, queue))
+    finally:
+        queue.put(('exit',))
+
+
+def run_writer(indexer: MessageIndexer, queue, processes) -> int:
+    """Single writer draining every crawler's queue into the database"""
+    remaining = len(processes)
+    total = 0
+    # Channels with a lost batch stay failed even when their crawler later reports done
+    failed_channels = set()
+    while remaining:
+        try:
+            item = queue.get(timeout=WRITER_POLL_SECONDS)
+        except Empty:
+            # A crawler killed before sending its exit marker would otherwise hang the writer
+            if not any(process.is_alive() for process in processes):
+                logger.error(f"{remaining} 個回填程序未正常結束")
+                break
+            continue
+
+        kind = item[0]
+        try:
+            if kind == 'batch':
+                total += write_backfill_batch(indexer, item[1], failed_channels)
+            elif kind == 'progress':
+                _, channel_id, status, count = item
+                if channel_id in failed_channels and status == 'done':
+                    status = 'failed'
+                indexer.update_backfill_progress(channel_id, status=status, messages_indexed=count)
+            elif kind == 'exit':
+                remaining -= 1
+        except Exception as e:
+            logger.error(f"寫入回填資料時發生錯誤: {e}", exc_info=True)
+    return total
+
+
+def write_backfill_batch(indexer: MessageIndexer, batch, failed_channels: set) -> int:
+    """Write a crawler batch, marking its channel failed if the batch is lost"""
+    try:
+        return indexer.write_batch(batch)
+    except Exception as e:
+        channel_id = batch[0].get('channel_id') if batch else None
+        logger.error(f"寫入頻道 {channel_id} 的批次時發生錯誤，頻道標記為失敗: {e}", exc_info=True)
+        if channel_id is not None:
+            failed_channels.add(channel_id)
+            indexer.update_backfill_progress(channel_id, status='failed')
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless bulk backfill of the message index")
+    parser.add_argument('guild_id', type=int, help="Guild to backfill")
+    parser.add_argument('--channels', nargs='*', help="Only backfill these channel IDs")
+    parser.add_argument('--processes', type=int, default=settings.BACKFILL_PROCESSES,
+                        help="Number of crawler processes")
+    args = parser.parse_args()
+
+    channels = asyncio.run(list_text_channels(args.guild_id))
+    if args.channels:
+        channels = [c for c in channels if c[0] in set(args.channels)]
+    if not channels:
+        logger.error("找不到要處理的頻道")
+        return
+
+    indexer = MessageIndexer()
+    for channel_id, name in channels:
+        indexer.update_backfill_progress(channel_id, name, status='pending', messages_indexed=0)
+
+    # Round-robin channels so each process owns a fixed subset
+    process_count = max(1, min(args.processes, len(channels)))
+    subsets = [
+        [channel_id for channel_id, _ in channels[i::process_count]]
+        for i in range(process_count)
+    ]
+
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue(maxsize=process_count * 4)
+    processes = [ctx.Process(target=crawler_process, args=(subset, queue)) for subset in subsets]
+
+    logger.info(f"開始回填 {len(channels)} 個頻道，程序數: {process_count}")
+    for process in processes:
+        process.start()
+
+    try:
+        total = run_writer(indexer, queue, processes)
+        logger.info(f"回填完成，共寫入 {total} 則訊息")
+    finally:
+        # Crawlers may be blocked on a full queue if the writer stopped early
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        indexer.fail_unfinished_backfill([channel_id for channel_id, _ in channels])
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("Backfill stopped by user")
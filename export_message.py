@@ -1,30 +1,41 @@
 import json
 import re
-from sqlalchemy.orm import sessionmaker
-from src.database import Message, init_db
+from src.database import Message
+from src.utils.indexer import MessageIndexer
+from src.utils.logger import setup_logger
 
-# Initialize the database session
-engine = init_db()
-Session = sessionmaker(bind=engine)
-session = Session()
+logger = setup_logger(__name__)
 
 def get_user_message_history(author_id: str):
+    # Open the database only when exporting, not at import time
+    indexer = MessageIndexer(record_dir=None)
+    session = indexer.Session()
     try:
         messages = session.query(Message).filter_by(author_name=author_id).order_by(Message.created_at.desc()).all()
-        return messages
     except Exception as e:
         print(f"Error retrieving message history: {e}")
         return []
     finally:
         session.close()
 
+    # Archived messages keep their row but their content lives in compressed blocks
+    archived = [message for message in messages if message.content is None]
+    if archived:
+        contents = indexer.archiver.get_archived_contents(archived)
+        for message in archived:
+            message.content = contents.get(message.discord_message_id)
+        missing = sum(1 for message in archived if message.content is None)
+        if missing:
+            logger.warning(f"Skipping {missing} archived messages whose content could not be found")
+    return messages
+
 def contains_chinese(text):
     """Check if the text contains any Chinese characters"""
     return re.search(r'[\u4e00-\u9fff]', text) is not None
 
 def is_valid_message(content):
     """Check if the message content is valid (not empty, not a GIF, not an image)"""
-    if not content.strip():
+    if not content or not content.strip():
         return False
     if re.search(r'\bhttps?://\S+\.(?:jpg|jpeg|png|gif)\b', content):
         return False
@@ -46,10 +57,11 @@ def save_to_jsonl(data, filename):
             json.dump(entry, f, ensure_ascii=False)
             f.write('\n')
 
-# Example usage
-user_id = 'super_sus514'
-message_history = get_user_message_history(user_id)
-training_data = format_messages_for_training(message_history)
-save_to_jsonl(training_data, 'user_chat_history.jsonl')
+if __name__ == "__main__":
+    # Example usage
+    user_id = 'super_sus514'
+    message_history = get_user_message_history(user_id)
+    training_data = format_messages_for_training(message_history)
+    save_to_jsonl(training_data, 'user_chat_history.jsonl')
 
-print(f"Saved {len(training_data)} messages to user_chat_history.jsonl")
+    print(f"Saved {len(training_data)} messages to user_chat_history.jsonl")
@@ -1,3 +1,8 @@
+import time
+
+# Startup timing marks, logged once the bot is ready
+startup_marks = {'start': time.perf_counter()}
+
 import discord
 from discord.ext import commands
 import asyncio
@@ -11,6 +16,7 @@ from src.config import settings
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
+startup_marks['imports'] = time.perf_counter()
 
 # Configure intents
 intents = discord.Intents.default()
@@ -20,9 +26,23 @@ intents.members = True
 # Create bot instance
 bot = commands.Bot(command_prefix=settings.COMMAND_PREFIX, intents=intents)
 
+def log_startup_timing():
+    """Log how long each startup phase took"""
+    phases = ['start', 'imports', 'extensions', 'ready']
+    breakdown = ", ".join(
+        f"{phase}: {(startup_marks[phase] - startup_marks[previous]) * 1000:.0f}ms"
+        for previous, phase in zip(phases, phases[1:])
+    )
+    total = (startup_marks['ready'] - startup_marks['start']) * 1000
+    logger.info(f"Startup timing ({total:.0f}ms total) - {breakdown}")
+
 @bot.event
 async def on_ready():
     logger.info(f'Bot has logged in as {bot.user.name}')
+    # on_ready fires again after reconnects, only time the first one
+    if 'ready' not in startup_marks:
+        startup_marks['ready'] = time.perf_counter()
+        log_startup_timing()
 
 async def main():
     async with bot:
@@ -30,6 +50,7 @@ async def main():
             # Make sure this path matches your file structure
             await bot.load_extension('src.cogs.keyword_counter')
             logger.info("Keyword counter cog loaded")
+            startup_marks['extensions'] = time.perf_counter()
             await bot.start(settings.DISCORD_TOKEN)
         except Exception as e:
             logger.error(f"Failed to start bot: {e}", exc_info=True)  # Added exc_info for more details
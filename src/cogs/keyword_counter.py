@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
-import heapq
+import asyncio
+from src.config import settings
+from src.cogs.pagination import build_result_pages, build_result_file, ResultPaginator
 from src.utils.indexer import MessageIndexer
 from src.utils.logger import setup_logger
 
@@ -11,6 +13,21 @@ class KeywordCounter(commands.Cog):
         self.bot = bot
         self.indexer = MessageIndexer()
         self.processing = False
+        self.cache_warmed = False
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Open the database and warm its page cache in the background once connected"""
+        if self.cache_warmed:
+            return
+        self.cache_warmed = True
+        try:
+            await asyncio.get_event_loop().run_in_executor(
+                self.indexer.executor,
+                self.indexer.warm_cache
+            )
+        except Exception as e:
+            logger.warning(f"Failed to warm page cache: {e}")
 
     async def update_index(self, channel, progress_message):
         """
@@ -45,6 +62,12 @@ class KeywordCounter(commands.Cog):
             await ctx.send("已有索引任務在執行中")
             return
 
+        if self.indexer.is_backfill_running():
+            await ctx.send(
+                f"回填任務執行中，請使用 {settings.COMMAND_PREFIX}索引進度 查看進度"
+            )
+            return
+
         try:
             self.processing = True
             channels = self._get_channels(ctx, channel_type)
@@ -109,6 +132,48 @@ class KeywordCounter(commands.Cog):
         finally:
             self.processing = False
 
+    @commands.command(name='索引進度')
+    async def backfill_progress(self, ctx):
+        """
+        Show progress of the headless backfill runner
+
+        Args:
+            ctx: Command context
+        """
+        try:
+            rows = self.indexer.get_backfill_progress()
+            if not rows:
+                await ctx.send("目前沒有回填紀錄")
+                return
+
+            status_counts = {}
+            for row in rows:
+                status_counts[row['status']] = status_counts.get(row['status'], 0) + 1
+            total_messages = sum(row['messages_indexed'] or 0 for row in rows)
+
+            progress_text = (
+                f"回填進度: {status_counts.get('done', 0)}/{len(rows)} 頻道完成\n"
+                f"執行中: {status_counts.get('running', 0)}, "
+                f"等待中: {status_counts.get('pending', 0)}, "
+                f"失敗: {status_counts.get('failed', 0)}\n"
+                f"已索引訊息數: {total_messages:,}\n"
+            )
+            if status_counts.get('stale'):
+                progress_text += (
+                    f"已中斷: {status_counts['stale']} "
+                    f"(超過 {settings.BACKFILL_STALE_MINUTES} 分鐘未更新，請重新執行回填)\n"
+                )
+            running = [row for row in rows if row['status'] == 'running'][:5]
+            if running:
+                progress_text += "\n處理中的頻道:\n"
+                for row in running:
+                    progress_text += f"- {row['channel_name']}: {row['messages_indexed'] or 0:,} 訊息\n"
+            await ctx.send(progress_text)
+
+        except Exception as e:
+            logger.error(f"Error reading backfill progress: {e}", exc_info=True)
+            await ctx.send(f"發生錯誤: {str(e)}")
+
     @commands.command(name='統計關鍵字')
     async def analyze_keywords(self, ctx, channel_type: str = "current", *keywords):
         """
@@ -134,19 +199,26 @@ class KeywordCounter(commands.Cog):
 
             # Search using index
             progress_message = await ctx.send("搜尋訊息中...")
-            results = self.indexer.search_messages(keywords, channel_ids)
-
-            # Display results
-            for keyword, user_counts in results.items():
-                if user_counts:
-                    top_users = heapq.nlargest(3, user_counts.items(), key=lambda x: x[1])
-                    result_msg = f"\n關鍵字 '{keyword}' 的結果：\n"
-                    for user, count in top_users:
-                        result_msg += f"- {user}: {count} 次\n"
-                    result_msg += f"\n總計出現：{sum(user_counts.values())} 次"
-                    await ctx.send(result_msg)
-                else:
-                    await ctx.send(f"找不到關鍵字 '{keyword}' 的使用記錄")
+            results = await asyncio.get_event_loop().run_in_executor(
+                self.indexer.executor,
+                self.indexer.search_messages,
+                keywords,
+                channel_ids
+            )
+
+            # Render every keyword into one message, paginated if needed
+            pages = build_result_pages(results, settings.RESULT_TOP_N, settings.RESULT_FIELDS_PER_PAGE)
+            edit_kwargs = {'content': None, 'embed': pages[0]}
+            if len(pages) > 1:
+                view = ResultPaginator(pages, ctx.author.id)
+                view.message = progress_message
+                edit_kwargs['view'] = view
+            if len(pages) > settings.RESULT_MAX_PAGES:
+                edit_kwargs['content'] = "結果過多，完整結果請見附件"
+                edit_kwargs['attachments'] = [
+                    build_result_file(results, settings.RESULT_FILE_FORMAT)
+                ]
+            await progress_message.edit(**edit_kwargs)
 
         except Exception as e:
             logger.error(f"Error in keyword analysis: {e}")
@@ -154,6 +226,195 @@ class KeywordCounter(commands.Cog):
         finally:
             self.processing = False
 
+    @commands.command(name='用戶統計')
+    async def user_stats(self, ctx, user: discord.User, *keywords):
+        """
+        Show a user's message count and keyword usage
+
+        Args:
+            ctx: Command context
+            user: User to profile, by mention or ID (also works after they left the server)
+            keywords: Optional keywords to count for this user
+        """
+        try:
+            stats = await asyncio.get_event_loop().run_in_executor(
+                self.indexer.executor,
+                self.indexer.get_user_stats,
+                str(user.id),
+                list(keywords)
+            )
+
+            embed = discord.Embed(title=f"{user.display_name} 的用戶統計")
+            summary = f"訊息數: {stats['message_count']:,}"
+            if stats['first_message_at']:
+                summary += (
+                    f"\n首則訊息: {stats['first_message_at']:%Y-%m-%d}"
+                    f"\n最新訊息: {stats['last_message_at']:%Y-%m-%d}"
+                )
+            embed.add_field(name="概要", value=summary, inline=False)
+
+            if stats['keywords']:
+                value = "\n".join(
+                    f"- {keyword}: {count:,} 次" for keyword, count in stats['keywords'].items()
+                )
+                embed.add_field(name="關鍵字", value=value[:1024], inline=False)
+
+            if stats['top_keywords']:
+                value = "\n".join(
+                    f"- {keyword}: {count:,} 次" for keyword, count in stats['top_keywords']
+                )
+                embed.add_field(name="最常說的追蹤關鍵字", value=value[:1024], inline=False)
+
+            if stats['untracked']:
+                embed.set_footer(text=f"使用 {settings.COMMAND_PREFIX}追蹤關鍵字 可加速未追蹤的關鍵字查詢")
+            await ctx.send(embed=embed)
+
+        except Exception as e:
+            logger.error(f"Error in user stats: {e}", exc_info=True)
+            await ctx.send(f"發生錯誤：{str(e)}")
+
+    @user_stats.error
+    async def user_stats_error(self, ctx, error):
+        """Reply when the user argument is missing or cannot be resolved"""
+        if isinstance(error, commands.MissingRequiredArgument):
+            await ctx.send(f"用法: {settings.COMMAND_PREFIX}用戶統計 @用戶 [關鍵字...]")
+        elif isinstance(error, commands.UserNotFound):
+            await ctx.send(f"找不到用戶 '{error.argument}'")
+        else:
+            logger.error(f"Error in user stats command: {error}", exc_info=error)
+
+    @commands.command(name='追蹤關鍵字')
+    async def track_keywords(self, ctx, *keywords):
+        """
+        Maintain per-user counters for keywords at ingest
+
+        Args:
+            ctx: Command context
+            keywords: Keywords to track
+        """
+        if not keywords:
+            await ctx.send("請提供要追蹤的關鍵字！")
+            return
+
+        if self.processing:
+            await ctx.send("已有索引任務在執行中")
+            return
+
+        try:
+            self.processing = True
+            status_message = await ctx.send("正在建立關鍵字計數...")
+            new_keywords = await asyncio.get_event_loop().run_in_executor(
+                self.indexer.executor,
+                self.indexer.track_keywords,
+                list(keywords)
+            )
+            if new_keywords:
+                await status_message.edit(content=f"開始追蹤: {', '.join(new_keywords)}")
+            else:
+                await status_message.edit(content="這些關鍵字已在追蹤中")
+
+        except Exception as e:
+            logger.error(f"Error tracking keywords: {e}", exc_info=True)
+            await ctx.send(f"發生錯誤: {str(e)}")
+        finally:
+            self.processing = False
+
+    @commands.command(name='歸檔訊息')
+    @commands.has_permissions(administrator=True)
+    async def archive_messages(self, ctx, days: int = settings.ARCHIVE_AFTER_DAYS, *probe_keywords):
+        """
+        Compress message content older than the given age into archive blocks
+
+        Args:
+            ctx: Command context
+            days: Minimum message age in days
+            probe_keywords: Optional keywords used to compare query latency
+        """
+        if self.processing:
+            await ctx.send("已有索引任務在執行中")
+            return
+
+        try:
+            self.processing = True
+            status_message = await ctx.send(f"正在歸檔 {days} 天前的訊息...")
+            report = await asyncio.get_event_loop().run_in_executor(
+                self.indexer.executor,
+                self.indexer.archive_messages,
+                days,
+                list(probe_keywords)
+            )
+
+            summary = (
+                f"歸檔完成！\n"
+                f"歸檔訊息數: {report['messages']:,}\n"
+                f"壓縮區塊數: {report['blocks']:,}\n"
+                f"節省空間: {report['bytes_saved']:,} bytes "
+                f"(釋放檔案空間 {report['vacuumed_bytes']:,} bytes)"
+            )
+            if 'latency_before' in report:
+                summary += (
+                    f"\n查詢耗時: {report['latency_before'] * 1000:.1f}ms → "
+                    f"{report['latency_after'] * 1000:.1f}ms"
+                )
+            await status_message.edit(content=summary)
+
+        except Exception as e:
+            logger.error(f"Error archiving messages: {e}", exc_info=True)
+            await ctx.send(f"發生錯誤: {str(e)}")
+        finally:
+            self.processing = False
+
+    @archive_messages.error
+    async def archive_messages_error(self, ctx, error):
+        """Reply when a non-administrator tries to archive"""
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("只有管理員可以執行歸檔")
+        else:
+            logger.error(f"Error in archive command: {error}", exc_info=error)
+
+    @commands.command(name='壓縮資料庫')
+    @commands.has_permissions(administrator=True)
+    async def compact_database(self, ctx):
+        """
+        Return free space to the filesystem, running a full VACUUM once if needed
+
+        A full VACUUM locks the database until it finishes, so it only runs
+        from this command and never as part of archiving.
+
+        Args:
+            ctx: Command context
+        """
+        if self.processing:
+            await ctx.send("已有索引任務在執行中")
+            return
+
+        if self.indexer.is_backfill_running():
+            await ctx.send("回填任務執行中，請在回填完成後再壓縮資料庫")
+            return
+
+        try:
+            self.processing = True
+            status_message = await ctx.send("正在壓縮資料庫，期間資料庫將暫時無法寫入...")
+            released = await asyncio.get_event_loop().run_in_executor(
+                self.indexer.executor,
+                self.indexer.compact_database
+            )
+            await status_message.edit(content=f"壓縮完成！釋放檔案空間 {released:,} bytes")
+
+        except Exception as e:
+            logger.error(f"Error compacting database: {e}", exc_info=True)
+            await ctx.send(f"發生錯誤: {str(e)}")
+        finally:
+            self.processing = False
+
+    @compact_database.error
+    async def compact_database_error(self, ctx, error):
+        """Reply when a non-administrator tries to compact the database"""
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("只有管理員可以壓縮資料庫")
+        else:
+            logger.error(f"Error in compact command: {error}", exc_info=error)
+
     def _get_channels(self, ctx, channel_type: str):
         """
         Helper method to get channels based on type
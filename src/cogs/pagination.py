@@ -0,0 +1,133 @@
+import csv
+import heapq
+import io
+import json
+from typing import Dict, List
+
+import discord
+
+# Discord embed limits
+EMBED_TOTAL_LIMIT = 6000
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+
+
+def _keyword_field(keyword: str, user_counts: Dict[str, int], top_n: int):
+    """Render one keyword's top users as an embed field (name, value)"""
+    name = f"關鍵字 '{keyword}'"[:FIELD_NAME_LIMIT]
+    if not user_counts:
+        return name, "找不到使用記錄"
+
+    total_line = f"總計出現：{sum(user_counts.values())} 次"
+    lines = []
+    length = len(total_line)
+    for user, count in heapq.nlargest(top_n, user_counts.items(), key=lambda x: x[1]):
+        line = f"- {user}: {count} 次"
+        if length + len(line) + 2 > FIELD_VALUE_LIMIT:
+            break
+        lines.append(line)
+        length += len(line) + 1
+    lines.append("")
+    lines.append(total_line)
+    return name, "\n".join(lines)
+
+
+def build_result_pages(results: Dict[str, Dict[str, int]], top_n: int,
+                       fields_per_page: int = 10) -> List[discord.Embed]:
+    """
+    Render keyword results into as few embeds as Discord's limits allow
+
+    Args:
+        results: Dict mapping keywords to user message counts
+        top_n: Number of top users to list per keyword
+        fields_per_page: Maximum keyword fields per embed
+
+    Returns:
+        List of embeds, one per page
+    """
+    title = "關鍵字統計結果"
+    pages = []
+    page = discord.Embed(title=title)
+    page_length = len(title)
+
+    for keyword, user_counts in results.items():
+        name, value = _keyword_field(keyword, user_counts, top_n)
+        field_length = len(name) + len(value)
+        if len(page.fields) >= fields_per_page or page_length + field_length > EMBED_TOTAL_LIMIT - 100:
+            pages.append(page)
+            page = discord.Embed(title=title)
+            page_length = len(title)
+        page.add_field(name=name, value=value, inline=False)
+        page_length += field_length
+    pages.append(page)
+
+    if len(pages) > 1:
+        for i, embed in enumerate(pages, 1):
+            embed.set_footer(text=f"第 {i}/{len(pages)} 頁")
+    return pages
+
+
+def build_result_file(results: Dict[str, Dict[str, int]], file_format: str = 'csv') -> discord.File:
+    """
+    Export full keyword results as an attachment
+
+    Args:
+        results: Dict mapping keywords to user message counts
+        file_format: 'csv' or 'json'
+
+    Returns:
+        discord.File ready to attach
+    """
+    if file_format == 'json':
+        data = json.dumps(results, ensure_ascii=False, indent=2).encode('utf-8')
+        return discord.File(io.BytesIO(data), filename='keyword_results.json')
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['keyword', 'user', 'count'])
+    for keyword, user_counts in results.items():
+        for user, count in sorted(user_counts.items(), key=lambda x: x[1], reverse=True):
+            writer.writerow([keyword, user, count])
+    # utf-8-sig so spreadsheet apps detect the encoding of Chinese names
+    data = buffer.getvalue().encode('utf-8-sig')
+    return discord.File(io.BytesIO(data), filename='keyword_results.csv')
+
+
+class ResultPaginator(discord.ui.View):
+    """Button navigation between result pages, limited to the command author"""
+
+    def __init__(self, pages: List[discord.Embed], author_id: int, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.author_id = author_id
+        self.current = 0
+        self.message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.current == 0
+        self.next_page.disabled = self.current == len(self.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    async def _show(self, interaction: discord.Interaction):
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.current], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current = max(self.current - 1, 0)
+        await self._show(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.current = min(self.current + 1, len(self.pages) - 1)
+        await self._show(interaction)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.errors.HTTPException:
+                pass
@@ -12,6 +12,22 @@ COMMAND_PREFIX = os.getenv('COMMAND_PREFIX', '!')
 BATCH_SIZE = int(os.getenv('BATCH_SIZE', '1000'))
 MAX_CONCURRENT_CHANNELS = int(os.getenv('MAX_CONCURRENT_CHANNELS', '3'))  
 SLEEP_TIME = float(os.getenv('SLEEP_TIME', '1.0'))
+BACKFILL_PROCESSES = int(os.getenv('BACKFILL_PROCESSES', '4'))
+BACKFILL_STALE_MINUTES = int(os.getenv('BACKFILL_STALE_MINUTES', '10'))  # Running rows idle this long are from a dead backfill
+HISTORY_RECORD_DIR = os.getenv('HISTORY_RECORD_DIR')  # Record history fixtures when set
+HISTORY_RECORD_SCRAMBLE = os.getenv('HISTORY_RECORD_SCRAMBLE', 'false').lower() == 'true'
+
+# Result Rendering Configuration
+RESULT_TOP_N = int(os.getenv('RESULT_TOP_N', '3'))
+RESULT_FIELDS_PER_PAGE = int(os.getenv('RESULT_FIELDS_PER_PAGE', '10'))
+RESULT_MAX_PAGES = int(os.getenv('RESULT_MAX_PAGES', '5'))
+RESULT_FILE_FORMAT = os.getenv('RESULT_FILE_FORMAT', 'csv')  # csv/json
+
+# Archive Configuration
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '365'))
+ARCHIVE_BLOCK_SIZE = int(os.getenv('ARCHIVE_BLOCK_SIZE', '5000'))
+ARCHIVE_COMPRESSION_LEVEL = int(os.getenv('ARCHIVE_COMPRESSION_LEVEL', '10'))
+ARCHIVE_DICT_SIZE = int(os.getenv('ARCHIVE_DICT_SIZE', '112640'))
 
 # Logging Configuration
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
\ No newline at end of file
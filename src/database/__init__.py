@@ -1,3 +1,9 @@
-from .models import Message, init_db
+from .models import (
+    Message, ArchiveBlock, ArchiveDictionary, BackfillProgress,
+    TrackedKeyword, AuthorKeywordCount, init_db
+)
 
-__all__ = ['Message', 'init_db']
\ No newline at end of file
+__all__ = [
+    'Message', 'ArchiveBlock', 'ArchiveDictionary', 'BackfillProgress',
+    'TrackedKeyword', 'AuthorKeywordCount', 'init_db'
+]
\ No newline at end of file
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    inspect, select, func, MetaData, Table, Column, Integer, String, Text, DateTime,
+    ForeignKey, Index, LargeBinary
+)
+
+from .models import SchemaVersion
+
+# Migrations define the tables they touch as they were at that version, never
+# through the models, so replaying them on a fresh database stays correct as
+# the models change.
+
+
+def _create_tables(conn):
+    """Baseline schema, also brings pre-versioning databases up to date"""
+    if conn.dialect.name == 'sqlite':
+        # Only takes effect before the first table is created, i.e. on new databases;
+        # existing ones switch with MessageArchiver.vacuum(full=True)
+        conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+    metadata = MetaData()
+    Table(
+        'messages', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('discord_message_id', String, unique=True),
+        Column('channel_id', String),
+        Column('author_id', String),
+        Column('author_name', String),
+        Column('content', Text),
+        Column('created_at', DateTime),
+        Index('idx_content', 'content', postgresql_using='gin'),
+        Index('idx_channel', 'channel_id'),
+        Index('idx_author', 'author_id'),
+        Index('idx_created', 'created_at'),
+    )
+    Table(
+        'archive_dictionaries', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('data', LargeBinary),
+        Column('sample_count', Integer),
+        Column('created_at', DateTime),
+    )
+    Table(
+        'archive_blocks', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('channel_id', String),
+        Column('month', String(7)),
+        Column('codec', String),
+        Column('dictionary_id', Integer, ForeignKey('archive_dictionaries.id'), nullable=True),
+        Column('message_count', Integer),
+        Column('first_created_at', DateTime),
+        Column('last_created_at', DateTime),
+        Column('raw_bytes', Integer),
+        Column('compressed_bytes', Integer),
+        Column('term_filter', LargeBinary),
+        Column('data', LargeBinary),
+        Index('idx_block_channel_month', 'channel_id', 'month'),
+    )
+    Table(
+        'backfill_progress', metadata,
+        Column('channel_id', String, primary_key=True),
+        Column('channel_name', String),
+        Column('status', String),
+        Column('messages_indexed', Integer),
+        Column('started_at', DateTime),
+        Column('finished_at', DateTime),
+        Column('updated_at', DateTime),
+    )
+    Table(
+        'schema_version', metadata,
+        Column('version', Integer, primary_key=True),
+        Column('applied_at', DateTime),
+    )
+    metadata.create_all(conn)
+
+
+def _add_author_keyword_index(conn):
+    """(author_id, created_at) index and per-author keyword counters"""
+    metadata = MetaData()
+    messages = Table(
+        'messages', metadata,
+        Column('author_id', String),
+        Column('created_at', DateTime),
+    )
+    Index('idx_author_created', messages.c.author_id, messages.c.created_at).create(conn, checkfirst=True)
+    Table(
+        'tracked_keywords', metadata,
+        Column('keyword', String, primary_key=True),
+        Column('created_at', DateTime),
+    )
+    Table(
+        'author_keyword_counts', metadata,
+        Column('author_id', String, primary_key=True),
+        Column('keyword', String, primary_key=True),
+        Column('count', Integer),
+    )
+    metadata.create_all(conn, tables=[metadata.tables['tracked_keywords'], metadata.tables['author_keyword_counts']])
+
+
+# Append new migrations, never reorder. A migration's version is its position + 1.
+MIGRATIONS = [
+    _create_tables,
+    _add_author_keyword_index,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn) -> int:
+    """Return the applied schema version, 0 for an unversioned database"""
+    if not inspect(conn).has_table(SchemaVersion.__tablename__):
+        return 0
+    return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+
+
+def migrate(engine):
+    """Apply pending migrations, a single version lookup when the schema is current"""
+    with engine.begin() as conn:
+        current = get_schema_version(conn)
+        if current >= SCHEMA_VERSION:
+            return
+
+        for version, migration in enumerate(MIGRATIONS[current:], current + 1):
+            migration(conn)
+            conn.execute(SchemaVersion.__table__.insert().values(
+                version=version,
+                applied_at=datetime.utcnow()
+            ))
@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred
 
 Base = declarative_base()
 
@@ -21,11 +21,74 @@ class Message(Base):
         Index('idx_channel', 'channel_id'),
         Index('idx_author', 'author_id'),
         Index('idx_created', 'created_at'),
+        Index('idx_author_created', 'author_id', 'created_at'),  # Per-user lookups
     )
 
+class TrackedKeyword(Base):
+    __tablename__ = 'tracked_keywords'
+
+    keyword = Column(String, primary_key=True)
+    created_at = Column(DateTime)
+
+class AuthorKeywordCount(Base):
+    __tablename__ = 'author_keyword_counts'
+
+    # Maintained at ingest for tracked keywords
+    author_id = Column(String, primary_key=True)
+    keyword = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+
+class ArchiveDictionary(Base):
+    __tablename__ = 'archive_dictionaries'
+
+    id = Column(Integer, primary_key=True)
+    data = Column(LargeBinary)
+    sample_count = Column(Integer)
+    created_at = Column(DateTime)
+
+class ArchiveBlock(Base):
+    __tablename__ = 'archive_blocks'
+
+    id = Column(Integer, primary_key=True)
+    channel_id = Column(String)
+    month = Column(String(7))  # YYYY-MM
+    codec = Column(String)
+    dictionary_id = Column(Integer, ForeignKey('archive_dictionaries.id'), nullable=True)
+    message_count = Column(Integer)
+    first_created_at = Column(DateTime)
+    last_created_at = Column(DateTime)
+    raw_bytes = Column(Integer)
+    compressed_bytes = Column(Integer)
+    term_filter = Column(LargeBinary)  # Bloom filter over case-folded character uni/bigrams
+    # Compressed payload is only loaded when a block can match a search
+    data = deferred(Column(LargeBinary))
+
+    __table_args__ = (
+        Index('idx_block_channel_month', 'channel_id', 'month'),
+    )
+
+class BackfillProgress(Base):
+    __tablename__ = 'backfill_progress'
+
+    channel_id = Column(String, primary_key=True)
+    channel_name = Column(String)
+    status = Column(String)  # pending/running/done/failed
+    messages_indexed = Column(Integer)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(DateTime)
+
 # Create database connection
 def init_db(db_url="sqlite:///messages.db"):
     """Initialize the database and return the engine"""
+    from .migrations import migrate
+
     engine = create_engine(db_url)
-    Base.metadata.create_all(engine)
+    migrate(engine)
     return engine  # Return engine instead of session
\ No newline at end of file
@@ -0,0 +1,347 @@
+import hashlib
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from src.config import settings
+from src.database import Message, ArchiveBlock, ArchiveDictionary
+from src.utils.logger import setup_logger
+from src.utils.matching import fold_case
+
+try:
+    import zstandard as zstd
+except ImportError:  # zstd is optional, fall back to zlib without a dictionary
+    zstd = None
+
+logger = setup_logger(__name__)
+
+BLOOM_BITS_PER_TERM = 8
+BLOOM_HASH_COUNT = 3
+DICT_SAMPLE_LIMIT = 20000
+
+
+def _terms(text: str) -> set:
+    """Case-folded character unigrams and bigrams of a text, using the search's fold_case rule"""
+    text = fold_case(text)
+    terms = set(text)
+    terms.update(text[i:i + 2] for i in range(len(text) - 1))
+    return terms
+
+
+def _bloom_positions(term: str, size_bits: int) -> List[int]:
+    digest = hashlib.blake2b(term.encode('utf-8'), digest_size=4 * BLOOM_HASH_COUNT).digest()
+    return [
+        int.from_bytes(digest[i * 4:(i + 1) * 4], 'little') % size_bits
+        for i in range(BLOOM_HASH_COUNT)
+    ]
+
+
+def _build_bloom(terms: set) -> bytes:
+    size_bits = max(64, len(terms) * BLOOM_BITS_PER_TERM)
+    bits = bytearray((size_bits + 7) // 8)
+    size_bits = len(bits) * 8
+    for term in terms:
+        for pos in _bloom_positions(term, size_bits):
+            bits[pos >> 3] |= 1 << (pos & 7)
+    return bytes(bits)
+
+
+def _bloom_might_contain(bits: bytes, keyword: str) -> bool:
+    """Check whether a block could contain keyword as a substring
+
+    Probes must be folded exactly like the block's terms; str.lower() is
+    context dependent (Greek final sigma) and would drop real matches.
+    """
+    keyword = fold_case(keyword)
+    if not keyword or not bits:
+        return True
+    if len(keyword) == 1:
+        probes = {keyword}
+    else:
+        probes = {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+    size_bits = len(bits) * 8
+    for term in probes:
+        for pos in _bloom_positions(term, size_bits):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+    return True
+
+
+class MessageArchiver:
+    """Move old message content into compressed per-channel, per-month blocks
+
+    Archived rows stay in the messages table with their content cleared, so
+    indexing still sees them as known message IDs.
+    """
+
+    def __init__(self, engine, get_session):
+        self.engine = engine
+        self.get_session = get_session
+        self.block_size = settings.ARCHIVE_BLOCK_SIZE
+        self.compression_level = settings.ARCHIVE_COMPRESSION_LEVEL
+        self._dictionaries = {}
+
+    def _load_dictionary(self, session, dictionary_id: int):
+        """Get a cached zstd dictionary by ID"""
+        if dictionary_id not in self._dictionaries:
+            row = session.get(ArchiveDictionary, dictionary_id)
+            self._dictionaries[dictionary_id] = zstd.ZstdCompressionDict(row.data)
+        return self._dictionaries[dictionary_id]
+
+    def _get_or_train_dictionary(self, session, cutoff: datetime) -> Optional[int]:
+        """Return the latest dictionary ID, training one from archivable content if none exists"""
+        if zstd is None:
+            return None
+
+        row = session.query(ArchiveDictionary).order_by(ArchiveDictionary.id.desc()).first()
+        if row:
+            return row.id
+
+        samples = [
+            content.encode('utf-8') for (content,) in session.query(Message.content)
+            .filter(Message.created_at < cutoff, Message.content.isnot(None))
+            .order_by(func.random())
+            .limit(DICT_SAMPLE_LIMIT)
+            if content
+        ]
+        try:
+            trained = zstd.train_dictionary(settings.ARCHIVE_DICT_SIZE, samples)
+        except zstd.ZstdError as e:
+            logger.warning(f"Could not train archive dictionary from {len(samples)} samples: {e}")
+            return None
+
+        row = ArchiveDictionary(
+            data=trained.as_bytes(),
+            sample_count=len(samples),
+            created_at=datetime.utcnow()
+        )
+        session.add(row)
+        session.flush()
+        self._dictionaries[row.id] = trained
+        logger.info(f"Trained archive dictionary {row.id} from {len(samples)} samples")
+        return row.id
+
+    def _compress(self, session, payload: bytes, dictionary_id: Optional[int]):
+        if zstd is None:
+            return 'zlib', zlib.compress(payload, min(self.compression_level, 9))
+        dict_data = self._load_dictionary(session, dictionary_id) if dictionary_id else None
+        compressor = zstd.ZstdCompressor(level=self.compression_level, dict_data=dict_data)
+        return 'zstd', compressor.compress(payload)
+
+    def _decompress(self, session, block: ArchiveBlock) -> list:
+        if block.codec == 'zlib':
+            payload = zlib.decompress(block.data)
+        else:
+            if zstd is None:
+                raise RuntimeError("zstandard is required to read zstd archive blocks")
+            dict_data = (
+                self._load_dictionary(session, block.dictionary_id)
+                if block.dictionary_id else None
+            )
+            payload = zstd.ZstdDecompressor(dict_data=dict_data).decompress(block.data)
+        return json.loads(payload)
+
+    def _write_block(self, session, channel_id: str, month: str, rows, dictionary_id) -> dict:
+        """Compress rows into a block and clear their live content"""
+        records = [
+            [r.discord_message_id, r.author_id, r.author_name, r.content, r.created_at.isoformat()]
+            for r in rows
+        ]
+        terms = set()
+        raw_bytes = 0
+        for r in rows:
+            terms |= _terms(r.content)
+            raw_bytes += len(r.content.encode('utf-8'))
+
+        payload = json.dumps(records, ensure_ascii=False).encode('utf-8')
+        codec, data = self._compress(session, payload, dictionary_id)
+        session.add(ArchiveBlock(
+            channel_id=channel_id,
+            month=month,
+            codec=codec,
+            dictionary_id=dictionary_id if codec == 'zstd' else None,
+            message_count=len(rows),
+            first_created_at=rows[0].created_at,
+            last_created_at=rows[-1].created_at,
+            raw_bytes=raw_bytes,
+            compressed_bytes=len(data),
+            term_filter=_build_bloom(terms),
+            data=data
+        ))
+        session.query(Message).filter(Message.id.in_([r.id for r in rows])) \
+            .update({Message.content: None}, synchronize_session=False)
+        return {'messages': len(rows), 'raw_bytes': raw_bytes, 'compressed_bytes': len(data)}
+
+    def archive(self, older_than_days: int = settings.ARCHIVE_AFTER_DAYS) -> Dict[str, int]:
+        """Archive message content older than the given age
+
+        The cutoff is rounded down to the start of its month, so each channel's
+        month is archived once as a whole instead of in small slices per run.
+
+        Args:
+            older_than_days: Minimum message age in days
+
+        Returns:
+            Dict with message, block and byte counts for this run
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        report = {'messages': 0, 'blocks': 0, 'raw_bytes': 0, 'compressed_bytes': 0}
+
+        with self.get_session() as session:
+            dictionary_id = self._get_or_train_dictionary(session, cutoff)
+            channel_ids = [
+                row[0] for row in session.query(Message.channel_id)
+                .filter(Message.created_at < cutoff, Message.content.isnot(None))
+                .distinct()
+            ]
+
+        for channel_id in channel_ids:
+            while True:
+                with self.get_session() as session:
+                    rows = (
+                        session.query(
+                            Message.id, Message.discord_message_id, Message.author_id,
+                            Message.author_name, Message.content, Message.created_at
+                        )
+                        .filter(
+                            Message.channel_id == channel_id,
+                            Message.created_at < cutoff,
+                            Message.content.isnot(None)
+                        )
+                        .order_by(Message.created_at, Message.id)
+                        .limit(self.block_size)
+                        .all()
+                    )
+                    if not rows:
+                        break
+
+                    by_month = defaultdict(list)
+                    for row in rows:
+                        by_month[row.created_at.strftime('%Y-%m')].append(row)
+
+                    months = list(by_month)
+                    # A full page may have cut the last month short; leave it for the next page
+                    if len(rows) == self.block_size and len(months) > 1:
+                        months = months[:-1]
+
+                    for month in months:
+                        written = self._write_block(
+                            session, channel_id, month, by_month[month], dictionary_id
+                        )
+                        report['blocks'] += 1
+                        for key in ('messages', 'raw_bytes', 'compressed_bytes'):
+                            report[key] += written[key]
+
+        report['bytes_saved'] = report['raw_bytes'] - report['compressed_bytes']
+        logger.info(
+            f"Archived {report['messages']} messages into {report['blocks']} blocks, "
+            f"saved {report['bytes_saved']:,} bytes"
+        )
+        return report
+
+    def search(self, keywords: List[str], channel_ids: List[str] = None,
+               author_id: str = None, by_author_id: bool = False) -> Dict[str, Dict[str, int]]:
+        """Count archived keyword usage per user, decompressing only blocks that may match
+
+        Args:
+            keywords: List of keywords to search for
+            channel_ids: Optional list of channel IDs to limit search
+            author_id: Optional author ID to limit search
+            by_author_id: Key counts by author ID instead of author name
+
+        Returns:
+            Dict mapping keywords to user message counts
+        """
+        results = {keyword: defaultdict(int) for keyword in keywords}
+
+        with self.get_session() as session:
+            query = session.query(ArchiveBlock)
+            if channel_ids:
+                query = query.filter(ArchiveBlock.channel_id.in_(channel_ids))
+
+            for block in query:
+                candidates = [kw for kw in keywords if _bloom_might_contain(block.term_filter, kw)]
+                if not candidates:
+                    continue
+                needles = [(kw, fold_case(kw)) for kw in candidates]
+                for _, record_author_id, author_name, content, _ in self._decompress(session, block):
+                    if author_id and record_author_id != author_id:
+                        continue
+                    user = record_author_id if by_author_id else author_name
+                    lowered = fold_case(content)
+                    for keyword, needle in needles:
+                        if needle in lowered:
+                            results[keyword][user] += 1
+
+        return {keyword: dict(counts) for keyword, counts in results.items()}
+
+    def get_archived_contents(self, messages) -> Dict[str, str]:
+        """Read archived content back for messages whose live content was cleared
+
+        Args:
+            messages: Message rows with discord_message_id, channel_id and created_at
+
+        Returns:
+            Dict mapping discord message IDs to their archived content
+        """
+        wanted = {m.discord_message_id for m in messages}
+        if not wanted:
+            return {}
+        channel_ids = {m.channel_id for m in messages}
+        months = {m.created_at.strftime('%Y-%m') for m in messages}
+
+        contents = {}
+        with self.get_session() as session:
+            blocks = session.query(ArchiveBlock).filter(
+                ArchiveBlock.channel_id.in_(channel_ids),
+                ArchiveBlock.month.in_(months)
+            )
+            for block in blocks:
+                for message_id, _, _, content, _ in self._decompress(session, block):
+                    if message_id in wanted:
+                        contents[message_id] = content
+        return contents
+
+    def vacuum(self, pages: int = None, full: bool = False) -> int:
+        """Return free pages to the filesystem (SQLite only)
+
+        Databases created before incremental auto-vacuum was enabled need one
+        full VACUUM to switch. It locks the database for its whole duration, so
+        it only runs when explicitly requested with full=True; otherwise this
+        is a no-op on those databases.
+
+        Args:
+            pages: Maximum number of pages to release, all if None
+            full: Switch to incremental auto-vacuum with a full VACUUM if needed
+
+        Returns:
+            int: Number of bytes released
+        """
+        if self.engine.dialect.name != 'sqlite':
+            return 0
+
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            page_size = conn.exec_driver_sql('PRAGMA page_size').scalar()
+            free_before = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+            if conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() != 2:
+                if not full:
+                    logger.info(
+                        f"Database is not in incremental auto-vacuum mode, "
+                        f"{free_before * page_size:,} free bytes kept until a full VACUUM"
+                    )
+                    return 0
+                logger.info("Switching database to incremental auto-vacuum")
+                conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.exec_driver_sql('VACUUM')
+            else:
+                # sqlite3 only steps a pragma once via execute(), which frees a single page
+                pragma = f'PRAGMA incremental_vacuum({int(pages)})' if pages else 'PRAGMA incremental_vacuum'
+                conn.connection.executescript(pragma)
+            free_after = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+
+        return max(free_before - free_after, 0) * page_size
@@ -0,0 +1,227 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import random
+import re
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FIXTURE_VERSION = 1
+# channel.history() fetches this many messages per REST call
+HISTORY_PAGE_SIZE = 100
+
+
+# Scripts whose letters are replaced by random letters of the same script,
+# every range is fully assigned so any pick is a real character
+_SCRIPT_RANGES = (
+    (0x3041, 0x3096),  # Hiragana
+    (0x30a1, 0x30fa),  # Katakana
+    (0x3400, 0x4dbf),  # CJK Unified Ideographs Extension A
+    (0x4e00, 0x9fff),  # CJK Unified Ideographs
+    (0xac00, 0xd7a3),  # Hangul syllables
+)
+
+
+def _scramble(text: str, seed: int) -> str:
+    """Replace every letter and digit with a random one of the same class, keeping length
+
+    Letters outside the known script ranges (accented Latin, Cyrillic, ...)
+    become random ASCII letters of the same case, any digit becomes an ASCII digit.
+    """
+    rng = random.Random(seed)
+    chars = []
+    for ch in text:
+        if ch.isdigit():
+            chars.append(str(rng.randint(0, 9)))
+        elif ch.isalpha():
+            code = ord(ch)
+            for start, end in _SCRIPT_RANGES:
+                if start <= code <= end:
+                    chars.append(chr(rng.randint(start, end)))
+                    break
+            else:
+                letter = chr(rng.randint(ord('a'), ord('z')))
+                chars.append(letter.upper() if ch.isupper() else letter)
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+_CHANNEL_ROUTE = re.compile(r'/channels/(\d+)/')
+
+
+class _RateLimitHandler(logging.Handler):
+    """Route discord.py rate limit warnings to the recorder of the channel in the request URL
+
+    Only 429 responses name their route. Pre-emptive bucket waits are logged
+    without one at DEBUG level, so they are not attributed to a channel; the
+    time spent in them is still part of each page's recorded wait.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.recorders = {}
+
+    def emit(self, record):
+        message = record.getMessage()
+        if 'rate limit' not in message.lower():
+            return
+        match = _CHANNEL_ROUTE.search(message)
+        recorder = self.recorders.get(match.group(1)) if match else None
+        if recorder:
+            recorder._events.append({'offset': time.perf_counter() - recorder._start, 'message': message})
+
+
+# One handler per process, shared by every recorder running in it
+_rate_limit_handler = _RateLimitHandler()
+
+
+class HistoryRecorder:
+    """Capture channel.history() pages with fetch timings into a gzip JSON lines fixture
+
+    The first line is a header, every following line is one page:
+    {"wait": seconds spent waiting for the page, "rate_limits": [...], "messages": [...]}
+
+    Recording errors are logged and stop the recording, they never interrupt
+    the history being consumed.
+    """
+
+    def __init__(self, path: str, channel, scramble: bool = False):
+        self.path = path
+        self.channel_id = str(channel.id)
+        self.scramble = scramble
+        self.failed = False
+        self.author_names = {}
+        self.message_count = 0
+        self.page_count = 0
+        self._events = []
+        self._page = []
+        self._page_wait = 0.0
+        self._page_events = []
+        self._start = time.perf_counter()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._write({
+            'version': FIXTURE_VERSION,
+            'channel_id': self.channel_id,
+            'channel_name': channel.name,
+            'recorded_at': datetime.utcnow().isoformat(),
+            'scrambled': scramble
+        })
+
+        discord_logger = logging.getLogger('discord.http')
+        if _rate_limit_handler not in discord_logger.handlers:
+            discord_logger.addHandler(_rate_limit_handler)
+        _rate_limit_handler.recorders[self.channel_id] = self
+
+    def _write(self, data: dict):
+        self._file.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def _record_message(self, message) -> list:
+        author_id = str(message.author.id)
+        author_name = message.author.name
+        content = message.content
+        if self.scramble:
+            author_name = self.author_names.setdefault(author_id, f"user{len(self.author_names) + 1}")
+            content = _scramble(content, message.id)
+        return [str(message.id), author_id, author_name, content, message.created_at.isoformat()]
+
+    async def wrap(self, history):
+        """Yield messages from history unchanged while recording them"""
+        requested = time.perf_counter()
+        async for message in history:
+            if not self.failed:
+                try:
+                    self._record(message, requested)
+                except Exception as e:
+                    self.failed = True
+                    logger.warning(f"Stopped recording {self.path}: {e}")
+            yield message
+            requested = time.perf_counter()
+
+    def _record(self, message, requested: float):
+        if len(self._page) >= HISTORY_PAGE_SIZE:
+            self._flush_page()
+        if not self._page:
+            # Time between asking for the next message and getting it, excluding our own processing
+            self._page_wait = time.perf_counter() - requested
+            self._page_events = self._events[:]
+            self._events.clear()
+        self._page.append(self._record_message(message))
+
+    def _flush_page(self):
+        self._write({
+            'wait': round(self._page_wait, 4),
+            'rate_limits': self._page_events,
+            'messages': self._page
+        })
+        self.page_count += 1
+        self.message_count += len(self._page)
+        self._page = []
+
+    def close(self):
+        """Write the last page, stop collecting rate limits and finish the fixture file"""
+        if _rate_limit_handler.recorders.get(self.channel_id) is self:
+            del _rate_limit_handler.recorders[self.channel_id]
+        if not _rate_limit_handler.recorders:
+            logging.getLogger('discord.http').removeHandler(_rate_limit_handler)
+
+        try:
+            if self._page and not self.failed:
+                self._flush_page()
+        finally:
+            self._file.close()
+        logger.info(
+            f"Recorded {self.message_count} messages in {self.page_count} pages to {self.path} "
+            f"({time.perf_counter() - self._start:.1f}s)"
+            + (" (incomplete)" if self.failed else "")
+        )
+
+
+class ReplayChannel:
+    """Stand-in for a text channel that replays a recorded fixture
+
+    Args:
+        path: Fixture file written by HistoryRecorder
+        speed: Replay speed multiplier, 1.0 for recorded timing, 0 for no delays
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+        if header.get('version') != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported fixture version in {path}: {header.get('version')}")
+        self.id = int(header['channel_id'])
+        self.name = header['channel_name']
+
+    async def history(self, limit=None, **kwargs):
+        """Yield recorded messages page by page, sleeping for each page's recorded wait"""
+        count = 0
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            f.readline()
+            for line in f:
+                page = json.loads(line)
+                if self.speed > 0 and page['wait']:
+                    await asyncio.sleep(page['wait'] / self.speed)
+                for event in page['rate_limits']:
+                    logger.warning(f"[replay {self.name}] {event['message']}")
+                for message_id, author_id, author_name, content, created_at in page['messages']:
+                    if limit is not None and count >= limit:
+                        return
+                    count += 1
+                    yield SimpleNamespace(
+                        id=int(message_id),
+                        author=SimpleNamespace(id=int(author_id), name=author_name),
+                        content=content,
+                        created_at=datetime.fromisoformat(created_at),
+                        channel=self
+                    )
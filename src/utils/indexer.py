@@ -1,26 +1,93 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Set
-from sqlalchemy import or_
+from sqlalchemy import or_, func, case
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
-from src.database import Message, init_db
+from src.database import Message, BackfillProgress, TrackedKeyword, AuthorKeywordCount, init_db
+from src.config import settings
 import concurrent.futures
+import os
+import heapq
+import threading
 import time
 import discord
 from contextlib import contextmanager
 from src.utils.logger import setup_logger
+from src.utils.archiver import MessageArchiver
+from src.utils.matching import keyword_filter, fold_case
+from src.utils.history_recorder import HistoryRecorder
 
 logger = setup_logger(__name__)
 
+# (index, column) pairs read by warm_cache
+HOT_INDEXES = (
+    ('idx_channel', 'channel_id'),
+    ('idx_created', 'created_at'),
+)
+
+# Longest gap between progress reports while only skipping known messages,
+# kept well below BACKFILL_STALE_MINUTES so a live backfill never looks stale
+PROGRESS_HEARTBEAT_SECONDS = 60
+
 class MessageIndexer:
-    def __init__(self):
-        # Get sessionmaker instance
-        self.Session = sessionmaker(bind=init_db())
+    def __init__(self, batch_writer=None, db_url: str = None, record_dir: str = settings.HISTORY_RECORD_DIR):
+        """
+        Args:
+            batch_writer: Optional callable receiving each batch of message dicts
+                instead of writing it to the database (used by backfill workers)
+            db_url: Optional database URL, defaults to init_db's
+            record_dir: Optional directory to record channel history fixtures into
+        """
+        # Engine, schema check and sessionmaker are created on first use
+        self._engine = None
+        self._Session = None
+        self._archiver = None
+        self._init_lock = threading.Lock()
+        self.db_url = db_url
+        self.record_dir = record_dir
         self.last_indexed = {}
         self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
         self.batch_size = 1000
         self.processing_semaphore = asyncio.Semaphore(5)
+        self.batch_writer = batch_writer
+
+    @property
+    def engine(self):
+        """Database engine, initialized and migrated on first access"""
+        if self._engine is None:
+            with self._init_lock:
+                if self._engine is None:
+                    start = time.perf_counter()
+                    self._engine = init_db(self.db_url) if self.db_url else init_db()
+                    logger.info(f"Database ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return self._engine
+
+    @property
+    def Session(self):
+        """Sessionmaker bound to the lazily created engine"""
+        if self._Session is None:
+            self._Session = sessionmaker(bind=self.engine)
+        return self._Session
+
+    @property
+    def archiver(self):
+        if self._archiver is None:
+            self._archiver = MessageArchiver(self.engine, self.get_session)
+        return self._archiver
+
+    def warm_cache(self):
+        """Scan hot indexes so the first queries after startup hit a warm page cache (SQLite only)"""
+        if self.engine.dialect.name != 'sqlite':
+            return
+
+        start = time.perf_counter()
+        with self.engine.connect() as conn:
+            for index_name, column in HOT_INDEXES:
+                conn.exec_driver_sql(
+                    f"SELECT COUNT({column}) FROM messages INDEXED BY {index_name}"
+                ).scalar()
+        logger.info(f"Page cache warmed in {(time.perf_counter() - start) * 1000:.0f}ms")
 
     @contextmanager
     def get_session(self):
@@ -77,6 +144,7 @@ class MessageIndexer:
         total_indexed = 0
         current_batch = []
         last_progress_update = time.time()
+        recorder = None
         
         try:
             # Get list of existing message IDs
@@ -87,9 +155,25 @@ class MessageIndexer:
                     .all()
                 )
 
+            history = channel.history(limit=None)
+            if self.record_dir:
+                # Recording is best effort and must never stop indexing
+                try:
+                    recorder = HistoryRecorder(
+                        os.path.join(self.record_dir, f"{channel.id}.jsonl.gz"),
+                        channel,
+                        scramble=settings.HISTORY_RECORD_SCRAMBLE
+                    )
+                    history = recorder.wrap(history)
+                except Exception as e:
+                    logger.warning(f"History recording disabled for {channel.name}: {e}")
+
             # Process messages in streaming fashion
-            async for message in channel.history(limit=None):
+            async for message in history:
                 if str(message.id) in existing_ids:
+                    if progress_callback and time.time() - last_progress_update >= PROGRESS_HEARTBEAT_SECONDS:
+                        await progress_callback(total_indexed)
+                        last_progress_update = time.time()
                     continue
 
                 # Store only necessary message data
@@ -128,21 +212,93 @@ class MessageIndexer:
         except Exception as e:
             logger.error(f"Error indexing channel {channel.name}: {e}")
             raise
+        finally:
+            if recorder:
+                try:
+                    recorder.close()
+                except Exception as e:
+                    logger.warning(f"Failed to finish history recording for {channel.name}: {e}")
 
         return total_indexed
 
+    def write_batch(self, batch: List[dict]) -> int:
+        """Write a batch of message dicts to database, skipping message IDs already stored
+        
+        Returns:
+            int: Number of messages inserted
+        """
+        with self.get_session() as session:
+            # existing_ids in index_channel is a snapshot, another writer may have stored some since
+            message_ids = [data['discord_message_id'] for data in batch]
+            seen = set()
+            for i in range(0, len(message_ids), 500):
+                seen.update(
+                    row[0] for row in session.query(Message.discord_message_id)
+                    .filter(Message.discord_message_id.in_(message_ids[i:i + 500]))
+                )
+
+            new_batch = []
+            for data in batch:
+                if data['discord_message_id'] not in seen:
+                    seen.add(data['discord_message_id'])
+                    new_batch.append(data)
+
+            session.bulk_save_objects([Message(**data) for data in new_batch])
+            self._update_keyword_counters(session, new_batch)
+
+        if len(new_batch) < len(batch):
+            logger.debug(f"Skipped {len(batch) - len(new_batch)} already stored messages")
+        return len(new_batch)
+
+    def _update_keyword_counters(self, session, batch: List[dict]):
+        """Add a batch's tracked keyword usage to the per-author counters"""
+        # Read after the batch is inserted: a keyword tracked concurrently is either
+        # seen here or its track_keywords scan already covers these rows
+        tracked = [row[0] for row in session.query(TrackedKeyword.keyword)]
+        if not tracked:
+            return
+
+        needles = [(keyword, fold_case(keyword)) for keyword in tracked]
+        deltas = {}
+        for data in batch:
+            content = fold_case(data['content'] or '')
+            for keyword, needle in needles:
+                if needle in content:
+                    key = (data['author_id'], keyword)
+                    deltas[key] = deltas.get(key, 0) + 1
+        if deltas:
+            self._add_to_counters(session, deltas)
+
+    def _add_to_counters(self, session, deltas: Dict[tuple, int]):
+        """Increment (author_id, keyword) counters, creating missing rows"""
+        author_ids = {author_id for author_id, _ in deltas}
+        keywords = {keyword for _, keyword in deltas}
+        existing = {
+            (row.author_id, row.keyword): row
+            for row in session.query(AuthorKeywordCount).filter(
+                AuthorKeywordCount.author_id.in_(author_ids),
+                AuthorKeywordCount.keyword.in_(keywords)
+            )
+        }
+        for (author_id, keyword), delta in deltas.items():
+            row = existing.get((author_id, keyword))
+            if row is None:
+                session.add(AuthorKeywordCount(author_id=author_id, keyword=keyword, count=delta))
+            else:
+                row.count += delta
+
     async def _save_batch(self, batch):
         """Save a batch of messages to database"""
-        async with self.processing_semaphore:
-            def db_operation():
-                with self.get_session() as session:
-                    messages = [Message(**data) for data in batch]
-                    session.bulk_save_objects(messages)
+        if self.batch_writer:
+            self.batch_writer(batch)
+            return
 
+        async with self.processing_semaphore:
             try:
                 await asyncio.get_event_loop().run_in_executor(
                     self.executor, 
-                    db_operation
+                    self.write_batch,
+                    batch
                 )
             except Exception as e:
                 logger.error(f"Error saving batch: {e}")
@@ -158,26 +314,239 @@ class MessageIndexer:
         Returns:
             Dict mapping keywords to user message counts
         """
-        results = {}
-        
+        keywords = list(dict.fromkeys(keywords))
+        results = {keyword: {} for keyword in keywords}
+        if not keywords:
+            return results
+
+        # One aggregation pass: a conditional count column per keyword, grouped by author
+        keyword_filters = [keyword_filter(Message.content, keyword) for keyword in keywords]
+        count_columns = [
+            func.sum(case((condition, 1), else_=0))
+            for condition in keyword_filters
+        ]
+
         with self.get_session() as session:
-            for keyword in keywords:
-                query = session.query(Message)
-                
-                keyword_filter = Message.content.ilike(f'%{keyword}%')
-                if channel_ids:
-                    query = query.filter(Message.channel_id.in_(channel_ids))
-                
-                messages = query.filter(keyword_filter).all()
-                
-                user_counts = {}
-                for msg in messages:
-                    user_counts[msg.author_name] = user_counts.get(msg.author_name, 0) + 1
-                
-                results[keyword] = user_counts
+            query = session.query(Message.author_name, *count_columns).filter(or_(*keyword_filters))
+            if channel_ids:
+                query = query.filter(Message.channel_id.in_(channel_ids))
+
+            for author_name, *counts in query.group_by(Message.author_name):
+                for keyword, count in zip(keywords, counts):
+                    if count:
+                        results[keyword][author_name] = count
+
+        # Merge counts from compressed archive blocks
+        archived = self.archiver.search(keywords, channel_ids)
+        for keyword, user_counts in archived.items():
+            for user, count in user_counts.items():
+                results[keyword][user] = results[keyword].get(user, 0) + count
                 
         return results
+
+    def track_keywords(self, keywords: List[str]) -> List[str]:
+        """Start maintaining per-author counters for keywords, backfilled from existing messages
+        
+        Args:
+            keywords: Keywords to track
+            
+        Returns:
+            List of keywords that were not tracked before
+        """
+        # Commit the tracked rows first: messages written after this are counted by
+        # write_batch, everything up to max_id is counted by the scan below
+        with self.get_session() as session:
+            tracked = {row[0] for row in session.query(TrackedKeyword.keyword)}
+            new_keywords = [kw for kw in dict.fromkeys(keywords) if kw not in tracked]
+            if not new_keywords:
+                return []
+            for keyword in new_keywords:
+                session.add(TrackedKeyword(keyword=keyword, created_at=datetime.utcnow()))
+            session.flush()
+            max_id = session.query(func.max(Message.id)).scalar() or 0
+
+        try:
+            with self.get_session() as session:
+                deltas = {}
+                for keyword in new_keywords:
+                    rows = session.query(Message.author_id, func.count(Message.id)) \
+                        .filter(Message.id <= max_id, keyword_filter(Message.content, keyword)) \
+                        .group_by(Message.author_id)
+                    for author_id, count in rows:
+                        deltas[(author_id, keyword)] = count
+
+                archived = self.archiver.search(new_keywords, by_author_id=True)
+                for keyword, user_counts in archived.items():
+                    for author_id, count in user_counts.items():
+                        deltas[(author_id, keyword)] = deltas.get((author_id, keyword), 0) + count
+
+                if deltas:
+                    self._add_to_counters(session, deltas)
+        except Exception:
+            # Untrack again so the keywords never serve partial counts
+            with self.get_session() as session:
+                session.query(AuthorKeywordCount).filter(
+                    AuthorKeywordCount.keyword.in_(new_keywords)
+                ).delete(synchronize_session=False)
+                session.query(TrackedKeyword).filter(
+                    TrackedKeyword.keyword.in_(new_keywords)
+                ).delete(synchronize_session=False)
+            raise
+
+        logger.info(f"Tracking keywords: {', '.join(new_keywords)}")
+        return new_keywords
+
+    def get_user_stats(self, author_id: str, keywords: List[str] = None, top_n: int = 10) -> dict:
+        """Keyword profile for one user, served from the author index and tracked counters
+        
+        Args:
+            author_id: Discord user ID
+            keywords: Optional keywords to count for this user
+            top_n: Number of most used tracked keywords to return
+            
+        Returns:
+            Dict with message count, first/last message time, keyword counts
+            and the user's most used tracked keywords
+        """
+        keywords = list(dict.fromkeys(keywords or []))
+        with self.get_session() as session:
+            # Covered by idx_author_created
+            message_count, first_at, last_at = session.query(
+                func.count(Message.author_id),
+                func.min(Message.created_at),
+                func.max(Message.created_at)
+            ).filter(Message.author_id == author_id).one()
+
+            counters = {
+                row.keyword: row.count
+                for row in session.query(AuthorKeywordCount)
+                .filter(AuthorKeywordCount.author_id == author_id)
+            }
+            tracked = {row[0] for row in session.query(TrackedKeyword.keyword)}
+
+            keyword_counts = {kw: counters.get(kw, 0) for kw in keywords if kw in tracked}
+            untracked = [kw for kw in keywords if kw not in tracked]
+            for keyword in untracked:
+                keyword_counts[keyword] = session.query(func.count(Message.id)).filter(
+                    Message.author_id == author_id,
+                    keyword_filter(Message.content, keyword)
+                ).scalar()
+
+        if untracked:
+            archived = self.archiver.search(untracked, author_id=author_id, by_author_id=True)
+            for keyword, user_counts in archived.items():
+                keyword_counts[keyword] += user_counts.get(author_id, 0)
+
+        return {
+            'message_count': message_count,
+            'first_message_at': first_at,
+            'last_message_at': last_at,
+            'keywords': {kw: keyword_counts[kw] for kw in keywords},
+            'untracked': untracked,
+            'top_keywords': heapq.nlargest(top_n, counters.items(), key=lambda x: x[1])
+        }
+
+    def archive_messages(self, older_than_days: int = settings.ARCHIVE_AFTER_DAYS,
+                         probe_keywords: List[str] = None) -> Dict[str, float]:
+        """Move old message content into compressed archive blocks
+        
+        Args:
+            older_than_days: Minimum message age in days
+            probe_keywords: Optional keywords to time searches before and after archiving
+            
+        Returns:
+            Dict with archive counts, bytes saved and probe query latency
+        """
+        def probe():
+            start = time.perf_counter()
+            self.search_messages(probe_keywords)
+            return time.perf_counter() - start
+
+        latency_before = probe() if probe_keywords else None
+        report = self.archiver.archive(older_than_days)
+        report['vacuumed_bytes'] = self.archiver.vacuum()
+        if probe_keywords:
+            report['latency_before'] = latency_before
+            report['latency_after'] = probe()
+        return report
     
+    def compact_database(self) -> int:
+        """Release all free pages, running the one-time full VACUUM if the database needs it
+
+        Returns:
+            int: Number of bytes released
+        """
+        return self.archiver.vacuum(full=True)
+
+    def update_backfill_progress(self, channel_id: str, channel_name: str = None,
+                                 status: str = None, messages_indexed: int = None):
+        """Create or update a channel's row in the backfill progress table"""
+        with self.get_session() as session:
+            row = session.get(BackfillProgress, channel_id)
+            if row is None:
+                row = BackfillProgress(channel_id=channel_id, status='pending', messages_indexed=0)
+                session.add(row)
+            if channel_name is not None:
+                row.channel_name = channel_name
+            if status is not None:
+                if status == 'pending':
+                    row.started_at = row.finished_at = None
+                if status == 'running' and row.started_at is None:
+                    row.started_at = datetime.utcnow()
+                if status in ('done', 'failed'):
+                    row.finished_at = datetime.utcnow()
+                row.status = status
+            if messages_indexed is not None:
+                row.messages_indexed = messages_indexed
+            row.updated_at = datetime.utcnow()
+
+    def _backfill_stale_before(self) -> datetime:
+        """Running rows not updated since this time belong to a backfill that died"""
+        return datetime.utcnow() - timedelta(minutes=settings.BACKFILL_STALE_MINUTES)
+
+    def is_backfill_running(self) -> bool:
+        """Check whether the headless backfill runner has channels in progress
+
+        Running rows that stopped updating are ignored, so a killed backfill
+        does not block indexing forever.
+        """
+        with self.get_session() as session:
+            return session.query(BackfillProgress).filter(
+                BackfillProgress.status == 'running',
+                BackfillProgress.updated_at >= self._backfill_stale_before()
+            ).first() is not None
+
+    def fail_unfinished_backfill(self, channel_ids: List[str]):
+        """Mark channels still pending or running as failed when a backfill run ends"""
+        with self.get_session() as session:
+            session.query(BackfillProgress).filter(
+                BackfillProgress.channel_id.in_(channel_ids),
+                BackfillProgress.status.in_(['pending', 'running'])
+            ).update({
+                BackfillProgress.status: 'failed',
+                BackfillProgress.finished_at: datetime.utcnow(),
+                BackfillProgress.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+
+    def get_backfill_progress(self) -> List[dict]:
+        """Get backfill progress for all channels, most recently updated first
+
+        Running rows that stopped updating are reported with status 'stale'.
+        """
+        stale_before = self._backfill_stale_before()
+        with self.get_session() as session:
+            rows = session.query(BackfillProgress).order_by(BackfillProgress.updated_at.desc()).all()
+            return [{
+                'channel_id': row.channel_id,
+                'channel_name': row.channel_name,
+                'status': (
+                    'stale' if row.status == 'running' and row.updated_at < stale_before
+                    else row.status
+                ),
+                'messages_indexed': row.messages_indexed,
+                'updated_at': row.updated_at
+            } for row in rows]
+
     async def index_channels(self, channels: List[discord.TextChannel], progress_callback=None):
         """Process multiple channels concurrently using queue system
         
@@ -209,7 +578,7 @@ class MessageIndexer:
                     try:
                         messages_processed = await self.index_channel(
                             channel,
-                            lambda count, ch=channel: progress_callback(ch, count) 
+                            (lambda count, ch=channel: progress_callback(ch, count))
                             if progress_callback else None
                         )
                         total_messages += messages_processed
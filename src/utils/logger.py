@@ -10,29 +10,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.config import settings
 
-def setup_logger(name: str) -> logging.Logger:
-    """
-    Set up a logger with colored output and rotating file logging
-    
-    Args:
-        name: The name of the logger
-        
-    Returns:
-        logging.Logger: Configured logger instance
-    """
-    # Create logger
-    logger = logging.getLogger(name)
-    
-    # Prevent adding handlers multiple times
-    if logger.handlers:
-        return logger
-        
-    logger.setLevel(settings.LOG_LEVEL)
+_handlers = None
+
+def _get_handlers():
+    """Create the shared console and file handlers once per process"""
+    global _handlers
+    if _handlers is not None:
+        return _handlers
 
     # Create logs directory if it doesn't exist
     log_dir = 'logs'
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
 
     # Create formatters
     file_formatter = logging.Formatter(
@@ -52,12 +40,13 @@ def setup_logger(name: str) -> logging.Logger:
         style='%'
     )
 
-    # Create rotating file handler
+    # Create rotating file handler, the file is opened on first write
     file_handler = RotatingFileHandler(
         filename=os.path.join(log_dir, 'discord_bot.log'),
         maxBytes=10*1024*1024,
         backupCount=5,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     file_handler.setFormatter(file_formatter)
     
@@ -65,8 +54,30 @@ def setup_logger(name: str) -> logging.Logger:
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(console_formatter)
 
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    _handlers = [file_handler, console_handler]
+    return _handlers
+
+def setup_logger(name: str) -> logging.Logger:
+    """
+    Set up a logger with colored output and rotating file logging
+    
+    Args:
+        name: The name of the logger
+        
+    Returns:
+        logging.Logger: Configured logger instance
+    """
+    # Create logger
+    logger = logging.getLogger(name)
+    
+    # Prevent adding handlers multiple times
+    if logger.handlers:
+        return logger
+        
+    logger.setLevel(settings.LOG_LEVEL)
+
+    # Add shared handlers to logger
+    for handler in _get_handlers():
+        logger.addHandler(handler)
 
     return logger
\ No newline at end of file
@@ -0,0 +1,23 @@
+import string
+
+# Keyword matching rule shared by SQL queries, archive scans and ingest counters:
+# a literal substring match that ignores case for ASCII letters only, which is
+# what SQLite's LIKE/lower() do.
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_case(text: str) -> str:
+    """Lowercase ASCII letters only, leaving every other character unchanged"""
+    return text.translate(_ASCII_LOWER)
+
+
+def keyword_filter(column, keyword: str):
+    """SQL filter for rows whose column contains keyword, with % and _ matched literally"""
+    escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return column.ilike(f'%{escaped}%', escape='\\')
+
+
+def contains_keyword(content: str, keyword: str) -> bool:
+    """Python equivalent of keyword_filter for a single text"""
+    return fold_case(keyword) in fold_case(content or '')
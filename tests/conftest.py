@@ -0,0 +1,29 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Make the src package importable when running pytest from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.indexer import MessageIndexer
+
+
+@pytest.fixture
+def indexer(tmp_path):
+    """MessageIndexer on a fresh SQLite database, without history recording"""
+    return MessageIndexer(db_url=f"sqlite:///{tmp_path / 'messages.db'}", record_dir=None)
+
+
+def make_message(message_id: int, content: str, author_id: int = 1, channel_id: int = 10,
+                 created_at: datetime = None) -> dict:
+    """Message dict in the format write_batch expects"""
+    return {
+        'discord_message_id': str(message_id),
+        'channel_id': str(channel_id),
+        'author_id': str(author_id),
+        'author_name': f"user{author_id}",
+        'content': content,
+        'created_at': created_at or datetime(2020, 1, 1) + timedelta(minutes=message_id)
+    }
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from queue import Queue
+from types import SimpleNamespace
+
+import backfill
+from conftest import make_message
+from src.config import settings
+from src.database import BackfillProgress
+
+
+def test_write_batch_skips_stored_and_repeated_ids(indexer):
+    assert indexer.write_batch([make_message(1, "a"), make_message(2, "b")]) == 2
+    assert indexer.write_batch([make_message(2, "b"), make_message(3, "c"), make_message(3, "c")]) == 1
+    assert indexer.search_messages(["a", "b", "c"]) == {
+        "a": {"user1": 1}, "b": {"user1": 1}, "c": {"user1": 1}
+    }
+
+
+def test_writer_survives_bad_batches_and_dead_crawlers(indexer, monkeypatch):
+    monkeypatch.setattr(backfill, 'WRITER_POLL_SECONDS', 0.01)
+    indexer.update_backfill_progress('10', 'general', status='pending', messages_indexed=0)
+    indexer.update_backfill_progress('11', 'random', status='pending', messages_indexed=0)
+
+    queue = Queue()
+    queue.put(('progress', '10', 'running', None))
+    queue.put(('batch', [{'channel_id': '10', 'not_a_column': 1}]))
+    queue.put(('batch', [make_message(1, "a")]))
+    queue.put(('progress', '10', 'done', 2))
+    queue.put(('progress', '11', 'running', None))
+    # The crawler died without sending ('exit',)
+    crawler = SimpleNamespace(is_alive=lambda: False)
+
+    assert backfill.run_writer(indexer, queue, [crawler]) == 1
+    statuses = {row['channel_id']: row['status'] for row in indexer.get_backfill_progress()}
+    # The channel that lost a batch must not be reported as done
+    assert statuses == {'10': 'failed', '11': 'running'}
+    assert indexer.is_backfill_running()
+
+    indexer.fail_unfinished_backfill(['10', '11'])
+    assert not indexer.is_backfill_running()
+    assert {row['status'] for row in indexer.get_backfill_progress()} == {'failed'}
+
+
+def test_stale_running_rows_do_not_block_indexing(indexer):
+    indexer.update_backfill_progress('10', 'general', status='running')
+    assert indexer.is_backfill_running()
+
+    # The backfill process was killed and stopped updating its rows
+    with indexer.get_session() as session:
+        session.get(BackfillProgress, '10').updated_at = (
+            datetime.utcnow() - timedelta(minutes=settings.BACKFILL_STALE_MINUTES + 1)
+        )
+
+    assert not indexer.is_backfill_running()
+    assert indexer.get_backfill_progress()[0]['status'] == 'stale'
@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import src.utils.indexer as indexer_module
+from src.utils.history_recorder import HistoryRecorder, ReplayChannel, _scramble
+from src.utils.indexer import MessageIndexer
+
+
+class FakeChannel:
+    """Channel whose history() yields generated messages, newest first like Discord"""
+
+    def __init__(self, channel_id: int, count: int):
+        self.id = channel_id
+        self.name = f"channel{channel_id}"
+        self.count = count
+
+    async def history(self, limit=None):
+        for i in range(self.count, 0, -1):
+            yield SimpleNamespace(
+                id=self.id * 100000 + i,
+                author=SimpleNamespace(id=i % 5, name=f"user{i % 5}"),
+                content=f"哈哈 message {i}",
+                created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+            )
+
+
+def _fast_clock(monkeypatch):
+    """Make every progress check in index_channel look 10 seconds apart"""
+    ticks = itertools.count(step=10)
+    monkeypatch.setattr(
+        indexer_module, 'time',
+        SimpleNamespace(time=lambda: next(ticks), perf_counter=indexer_module.time.perf_counter)
+    )
+
+
+def test_record_and_replay_round_trip(tmp_path, monkeypatch):
+    record_dir = tmp_path / "fixtures"
+    recorder = MessageIndexer(db_url=f"sqlite:///{tmp_path / 'recorded.db'}", record_dir=str(record_dir))
+    channels = [FakeChannel(1, 250), FakeChannel(2, 120)]
+    assert asyncio.run(recorder.index_channels(channels)) == 370
+
+    # Replay without a progress callback, crossing several progress ticks
+    _fast_clock(monkeypatch)
+    replayer = MessageIndexer(db_url=f"sqlite:///{tmp_path / 'replayed.db'}", record_dir=None)
+    replayer.batch_size = 50
+    replayed = [ReplayChannel(str(record_dir / f"{c.id}.jsonl.gz"), speed=0) for c in channels]
+    assert asyncio.run(replayer.index_channels(replayed)) == 370
+
+    keywords = ["哈哈", "message 1"]
+    assert replayer.search_messages(keywords) == recorder.search_messages(keywords)
+    assert [c.name for c in replayed] == ["channel1", "channel2"]
+
+
+def test_recording_failure_does_not_stop_indexing(tmp_path):
+    blocked = tmp_path / "not_a_directory"
+    blocked.write_text("")
+    indexer = MessageIndexer(db_url=f"sqlite:///{tmp_path / 'messages.db'}", record_dir=str(blocked))
+
+    assert asyncio.run(indexer.index_channel(FakeChannel(1, 30))) == 30
+
+
+def test_rate_limits_are_recorded_for_their_own_channel(tmp_path):
+    async def consume(recorder, channel):
+        async for _ in recorder.wrap(channel.history()):
+            pass
+
+    channels = [FakeChannel(1, 5), FakeChannel(2, 5)]
+    recorders = [HistoryRecorder(str(tmp_path / f"{c.id}.jsonl.gz"), c) for c in channels]
+    logging.getLogger('discord.http').warning(
+        'We are being rate limited. GET https://discord.com/api/v10/channels/2/messages '
+        'responded with 429. Retrying in 0.50 seconds.'
+    )
+    for recorder, channel in zip(recorders, channels):
+        asyncio.run(consume(recorder, channel))
+        recorder.close()
+
+    def events(channel_id):
+        with gzip.open(tmp_path / f"{channel_id}.jsonl.gz", 'rt', encoding='utf-8') as f:
+            pages = [json.loads(line) for line in f][1:]
+        return [event['message'] for page in pages for event in page['rate_limits']]
+
+    assert events(1) == []
+    assert len(events(2)) == 1 and '/channels/2/' in events(2)[0]
+
+
+def test_scramble_replaces_every_letter_and_digit():
+    text = "こんにちは カタカナ 한국어 café 㐀 哈哈 Привет secret 123"
+
+    scrambled = _scramble(text, 1)
+
+    assert len(scrambled) == len(text)
+    assert [ch.isspace() for ch in scrambled] == [ch.isspace() for ch in text]
+    assert not set(text.split()) & set(scrambled.split())
+    # Letters keep their script where it is known, others become ASCII
+    assert all('\u3041' <= ch <= '\u3096' for ch in scrambled.split()[0])
+    assert all('\uac00' <= ch <= '\ud7a3' for ch in scrambled.split()[2])
+    assert scrambled.split()[3].isascii() and scrambled.split()[6].isascii()
+    assert _scramble(text, 1) == scrambled
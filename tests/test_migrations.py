@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine, inspect, select, func
+
+from src.database import init_db
+from src.database.models import Base, SchemaVersion
+from src.database.migrations import SCHEMA_VERSION
+from src.utils.indexer import MessageIndexer
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            {column['name'] for column in inspector.get_columns(table)},
+            {index['name'] for index in inspector.get_indexes(table)}
+        )
+        for table in inspector.get_table_names()
+    }
+
+
+def test_fresh_database_matches_models(tmp_path):
+    migrated = init_db(f"sqlite:///{tmp_path / 'migrated.db'}")
+    reference = create_engine(f"sqlite:///{tmp_path / 'reference.db'}")
+    Base.metadata.create_all(reference)
+
+    assert _schema(migrated) == _schema(reference)
+    with migrated.connect() as conn:
+        assert conn.execute(select(func.max(SchemaVersion.version))).scalar() == SCHEMA_VERSION
+
+
+def test_unversioned_database_is_upgraded(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    legacy = create_engine(url)
+    with legacy.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE messages (id INTEGER PRIMARY KEY, discord_message_id VARCHAR UNIQUE, "
+            "channel_id VARCHAR, author_id VARCHAR, author_name VARCHAR, content TEXT, created_at DATETIME)"
+        )
+        conn.exec_driver_sql("INSERT INTO messages (discord_message_id, content) VALUES ('1', 'hi')")
+
+    engine = init_db(url)
+
+    schema = _schema(engine)
+    assert 'idx_author_created' in schema['messages'][1]
+    assert {'tracked_keywords', 'author_keyword_counts', 'archive_blocks'} <= set(schema)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT content FROM messages").scalar() == 'hi'
+
+
+def test_new_databases_use_incremental_vacuum(tmp_path):
+    engine = init_db(f"sqlite:///{tmp_path / 'new.db'}")
+
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2
+
+
+def test_full_vacuum_of_existing_database_is_opt_in(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    with create_engine(url).begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE filler (data TEXT)")
+    indexer = MessageIndexer(db_url=url, record_dir=None)
+
+    def auto_vacuum():
+        with indexer.engine.connect() as conn:
+            return conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+
+    indexer.archive_messages(30)
+    assert auto_vacuum() == 0
+
+    indexer.compact_database()
+    assert auto_vacuum() == 2
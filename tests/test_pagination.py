@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+from src.cogs.pagination import build_result_file, build_result_pages
+
+EMBED_FIELD_LIMIT = 25
+
+
+def _results(keyword_count: int, user_count: int, keyword_length: int = 10) -> dict:
+    return {
+        f"{i:03d}" + "關" * keyword_length: {
+            f"user{j}_" + "x" * 40: j + 1 for j in range(user_count)
+        }
+        for i in range(keyword_count)
+    }
+
+
+def test_pages_stay_within_discord_limits():
+    results = _results(60, 200, keyword_length=300)
+
+    pages = build_result_pages(results, top_n=100, fields_per_page=EMBED_FIELD_LIMIT)
+
+    assert len(pages) > 1
+    assert sum(len(page.fields) for page in pages) == len(results)
+    for i, page in enumerate(pages, 1):
+        assert len(page.fields) <= EMBED_FIELD_LIMIT
+        assert len(page) <= 6000
+        assert all(len(field.name) <= 256 and len(field.value) <= 1024 for field in page.fields)
+        assert page.footer.text == f"第 {i}/{len(pages)} 頁"
+
+
+def test_fields_per_page_is_respected():
+    pages = build_result_pages(_results(23, 3), top_n=3, fields_per_page=10)
+
+    assert [len(page.fields) for page in pages] == [10, 10, 3]
+
+
+def test_empty_results_give_a_single_page():
+    pages = build_result_pages({}, top_n=3)
+
+    assert len(pages) == 1
+    assert not pages[0].fields
+    assert pages[0].footer.text is None
+
+
+def test_result_file_contains_every_user():
+    results = {"哈哈": {f"user{i}": i + 1 for i in range(50)}, "missing": {}}
+
+    csv_file = build_result_file(results, 'csv')
+    rows = list(csv.reader(io.StringIO(csv_file.fp.read().decode('utf-8-sig'))))
+    assert csv_file.filename == 'keyword_results.csv'
+    assert rows[0] == ['keyword', 'user', 'count']
+    assert {(keyword, user, int(count)) for keyword, user, count in rows[1:]} == {
+        ("哈哈", user, count) for user, count in results["哈哈"].items()
+    }
+
+    json_file = build_result_file(results, 'json')
+    assert json_file.filename == 'keyword_results.json'
+    assert json.loads(json_file.fp.read().decode('utf-8')) == results
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from conftest import make_message
+from src.database import ArchiveBlock, Message
+
+CONTENTS = [
+    "<:pepe_hands:123> rip",
+    "pepeXhands is not the same",
+    "PEPE_HANDS loud",
+    "100% sure",
+    "1000 sure",
+    "Äpfel und äpfel",
+    "哈哈 笑死",
+    "back\\slash",
+    "ΑΣ",
+]
+
+KEYWORDS = ["pepe_hands", "100%", "äpfel", "Äpfel", "哈哈", "\\", "Σ", "missing"]
+
+
+def test_keyword_wildcards_match_literally(indexer):
+    indexer.write_batch([make_message(i, content) for i, content in enumerate(CONTENTS)])
+
+    results = indexer.search_messages(["pepe_hands", "100%"])
+
+    assert results["pepe_hands"] == {"user1": 2}
+    assert results["100%"] == {"user1": 1}
+
+
+def test_search_results_unchanged_by_archiving(indexer):
+    batch = [
+        make_message(i, content, author_id=i % 3, channel_id=10 + i % 2)
+        for i, content in enumerate(CONTENTS * 20)
+    ]
+    indexer.write_batch(batch)
+    before = indexer.search_messages(KEYWORDS)
+    before_channel = indexer.search_messages(KEYWORDS, ["10"])
+
+    report = indexer.archive_messages(30)
+
+    assert report['messages'] == len(batch)
+    assert indexer.search_messages(KEYWORDS) == before
+    assert indexer.search_messages(KEYWORDS, ["10"]) == before_channel
+
+
+def test_archived_content_can_be_read_back(indexer):
+    indexer.write_batch([make_message(i, content) for i, content in enumerate(CONTENTS)])
+    indexer.archive_messages(30)
+
+    with indexer.get_session() as session:
+        rows = session.query(Message).all()
+        assert all(row.content is None for row in rows)
+        contents = indexer.archiver.get_archived_contents(rows)
+
+    assert [contents[str(i)] for i in range(len(CONTENTS))] == CONTENTS
+
+
+def test_archive_takes_whole_months_once(indexer):
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month = month_start - timedelta(days=1)
+    indexer.write_batch([
+        make_message(1, "old", created_at=last_month),
+        make_message(2, "current", created_at=month_start),
+    ])
+
+    # The current month is still open, so nothing in it is archived yet
+    assert indexer.archive_messages(0)['messages'] == 1
+
+    indexer.write_batch([make_message(3, "current too", created_at=month_start)])
+    assert indexer.archive_messages(0)['messages'] == 0
+    with indexer.get_session() as session:
+        assert session.query(ArchiveBlock).count() == 1
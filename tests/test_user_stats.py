@@ -0,0 +1,37 @@
+from conftest import make_message
+
+CONTENTS = ["<:pepe_hands:1>", "pepeXhands", "PEPE_HANDS", "nothing"]
+
+
+def test_tracked_counts_match_untracked_counts(indexer):
+    indexer.write_batch([make_message(i, content) for i, content in enumerate(CONTENTS)])
+    untracked = indexer.get_user_stats("1", ["pepe_hands"])["keywords"]
+
+    assert indexer.track_keywords(["pepe_hands"]) == ["pepe_hands"]
+    tracked = indexer.get_user_stats("1", ["pepe_hands"])
+
+    assert tracked["untracked"] == []
+    assert tracked["keywords"] == untracked == {"pepe_hands": 2}
+
+
+def test_ingest_after_tracking_updates_counters(indexer):
+    indexer.write_batch([make_message(i, content) for i, content in enumerate(CONTENTS)])
+    indexer.track_keywords(["pepe_hands"])
+
+    indexer.write_batch([
+        make_message(10 + i, content) for i, content in enumerate(CONTENTS)
+    ] + [make_message(20, "pepe_hands", author_id=2)])
+
+    assert indexer.get_user_stats("1", ["pepe_hands"])["keywords"] == {"pepe_hands": 4}
+    assert indexer.get_user_stats("2", ["pepe_hands"])["top_keywords"] == [("pepe_hands", 1)]
+
+
+def test_tracking_counts_archived_messages_once(indexer):
+    indexer.write_batch([make_message(i, content) for i, content in enumerate(CONTENTS)])
+    indexer.archive_messages(30)
+
+    indexer.track_keywords(["pepe_hands"])
+
+    stats = indexer.get_user_stats("1", ["pepe_hands"])
+    assert stats["message_count"] == len(CONTENTS)
+    assert stats["keywords"] == {"pepe_hands": 2}